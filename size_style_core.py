@@ -6,14 +6,24 @@ so it can be reused from both Tkinter (desktop) and Streamlit (web) apps.
 """
 
 from __future__ import annotations
+import io
+import multiprocessing
 import os
 import re
 import sys
-from collections import defaultdict
-from dataclasses import dataclass
-from typing import Dict, Iterable, List, Sequence, Tuple
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import BinaryIO, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
 # Third-party deps
+try:
+    import pypdfium2 as pdfium  # type: ignore
+except Exception:
+    pdfium = None
+
 try:
     from pdfminer_high_level import extract_text as pdf_extract_text  # type: ignore
 except Exception:
@@ -23,30 +33,20 @@ except Exception:
         pdf_extract_text = None
 
 try:
+    from pdfminer.layout import LAParams  # type: ignore
+    from pdfminer.pdfpage import PDFPage  # type: ignore
+except Exception:
+    LAParams = None
+    PDFPage = None
+
+try:
+    import numpy as np
     import pandas as pd
 except Exception as e:
-    print("This app requires pandas. Try: pip install pandas", file=sys.stderr)
+    print("This app requires pandas and numpy. Try: pip install pandas numpy", file=sys.stderr)
     raise
 
 
-def detect_max_blank(lines):
-    blank_counts = []
-    for i, line in enumerate(lines):
-        if "style" in line.lower() or "size" in line.lower():
-            count = 0
-            j = i + 1
-            while j < len(lines) and lines[j].strip() == "":
-                count += 1
-                j += 1
-            blank_counts.append(count)
-
-    if not blank_counts:
-        return 1
-
-    avg = sum(blank_counts) / len(blank_counts)
-    return max(1, int(round(avg)) + 1)
-
-
 # ------------------------- Quantity helpers -------------------------
 def _parse_quantity_from_line(line: str) -> int | None:
     """
@@ -57,7 +57,7 @@ def _parse_quantity_from_line(line: str) -> int | None:
       - Qty 5
       - Quantity x 4
     """
-    m = re.search(r"(?:qty|quantity)\s*[:x]*\s*(\d+)", line, re.IGNORECASE)
+    m = QTY_SEARCH_RE.search(line)
     if m:
         return int(m.group(1))
     return None
@@ -67,6 +67,8 @@ def find_quantity_near(lines: List[str], idx: int, radius: int = 5) -> int:
     """
     Look for a Quantity / Qty line a few lines ABOVE or BELOW the label line.
     If none found, default to 1.
+    Kept for callers holding a list of lines; iter_entries does the same
+    lookup in a single streaming pass.
     """
     # Look upwards
     for offset in range(1, radius + 1):
@@ -90,6 +92,13 @@ def find_quantity_near(lines: List[str], idx: int, radius: int = 5) -> int:
     return 1
 
 
+def _line_quantity(line: str) -> int | None:
+    # Both "qty" and "quantity" contain "ty"; most lines fail this cheaply.
+    if "ty" not in line.lower():
+        return None
+    return _parse_quantity_from_line(line)
+
+
 # ------------------------- Config -------------------------
 LABEL_PATTERNS: Sequence[str] = (
     r"Size/Style:",
@@ -106,44 +115,163 @@ LABEL_RE = re.compile(
     re.IGNORECASE,
 )
 
+# Every LABEL_PATTERNS entry starts with one of these words; lets iter_entries
+# skip most ASCII lines without running LABEL_RE. Non-ASCII lines always go to
+# LABEL_RE: its IGNORECASE matching accepts letters (e.g. Turkish "ı", "İ")
+# that casefold() does not map onto these prefixes.
+LABEL_PREFIXES = ("size", "style", "shirt", "product")
+
 QTY_RE = re.compile(r"^\s*(?:qty|quantity)\s*[:x]*\s*(\d+)\s*$", re.IGNORECASE)
+QTY_SEARCH_RE = re.compile(r"(?:qty|quantity)\s*[:x]*\s*(\d+)", re.IGNORECASE)
+
+# Category patterns (matched against lowercased names)
+SHORT_SLEEVE_RE = re.compile(r"(shortsleeve|short\s*-?\s*sleeve|t\s*-?\s*shirt|tshirt|\btee\b)")
+TODDLER_RE = re.compile(r"\b[2-5]t\b")
+HOODIE_WORD_RE = re.compile(r"\bhoodie\b")
+SIZE_RE = re.compile(r"\b(xs|s|m|l|xl|[2-6]xl)\b")
+SIZE_ORDER = {s: i for i, s in enumerate(["xs", "s", "m", "l", "xl", "2xl", "3xl", "4xl", "5xl", "6xl"])}
 
 HOODIE_MARKERS = ("hooded sweatshirt", "unisex hoodie")
 
+# Category marker flags. category_rank scans the name once against
+# CATEGORY_MARKERS to build a bitmask, then resolves the ranking from bits.
+_SWEAT, _HOODED, _HOODIE, _HOODED_SWEAT, _UNISEX_HOODIE = 1, 2, 4, 8, 16
+_LONG_SLEEVE, _VNECK, _YOUTH, _TODDLER, _UNISEX, _ONESIE = 32, 64, 128, 256, 512, 1024
+# _SHORT_SLEEVE: spellings SHORT_SLEEVE_RE always matches.
+# _SHORT_SLEEVE_MAYBE: SHORT_SLEEVE_RE can only match if one of these is present.
+# _TODDLER_TOP: toddler short-sleeve markers.
+_SHORT_SLEEVE, _SHORT_SLEEVE_MAYBE, _TODDLER_TOP = 2048, 4096, 8192
+
+CATEGORY_MARKERS: Sequence[Tuple[str, int]] = (
+    ("sweatshirt", _SWEAT),
+    ("hooded sweatshirt", _HOODED_SWEAT),
+    ("hooded", _HOODED),
+    ("unisex hoodie", _UNISEX_HOODIE),
+    ("hoodie", _HOODIE),
+    ("long sleeve", _LONG_SLEEVE),
+    ("long-sleeve", _LONG_SLEEVE),
+    ("longsleeve", _LONG_SLEEVE),
+    ("v-neck", _VNECK),
+    ("v neck", _VNECK),
+    ("vneck", _VNECK),
+    ("youth", _YOUTH),
+    ("toddler", _TODDLER),
+    ("unisex", _UNISEX),
+    ("onesie", _ONESIE),
+    ("bodysuit", _ONESIE),
+    ("short sleeve", _SHORT_SLEEVE),
+    ("short-sleeve", _SHORT_SLEEVE),
+    ("shortsleeve", _SHORT_SLEEVE),
+    ("t-shirt", _SHORT_SLEEVE),
+    ("t shirt", _SHORT_SLEEVE),
+    ("tshirt", _SHORT_SLEEVE),
+    ("short", _TODDLER_TOP),
+    ("tee", _TODDLER_TOP | _SHORT_SLEEVE_MAYBE),
+    ("shirt", _TODDLER_TOP | _SHORT_SLEEVE_MAYBE),
+    ("sleeve", _SHORT_SLEEVE_MAYBE),
+)
+
+# category_rank returns 0..11
+CATEGORY_COUNT = 12
+
+# category_rank -> summary bucket (see summarize_by_category)
+CATEGORY_BUCKETS: Dict[int, str] = {
+    1: "longsleeve",
+    3: "adult_tee",
+    4: "youth",
+    5: "youth",
+    6: "toddler",
+    7: "toddler",
+    8: "onesie",
+    10: "vneck",
+}
+SUMMARY_BUCKETS = ("adult_tee", "vneck", "longsleeve", "youth", "toddler", "onesie", "apron", "tote")
+# Same mapping as a table: rank -> index into SUMMARY_BUCKETS, -1 for no bucket
+CATEGORY_BUCKET_INDEX = np.array(
+    [SUMMARY_BUCKETS.index(CATEGORY_BUCKETS[c]) if c in CATEGORY_BUCKETS else -1 for c in range(CATEGORY_COUNT)],
+    dtype=np.intp,
+)
+
+# pdfminer fallback: keep line grouping (labels are matched per line) but skip
+# the text-box ordering and vertical-text detection, which dominate its runtime.
+PDFMINER_LAPARAMS = LAParams(boxes_flow=None, detect_vertical=False) if LAParams is not None else None
+
+# pdfminer fallback only: PDFs with at least this many pages are split across
+# worker processes. Workers are spawned (not forked from the possibly
+# multi-threaded caller) and re-import this module, which costs far more
+# than a few pages of extraction.
+PARALLEL_MIN_PAGES = 64
+
 
 # ------------------------- Core logic -------------------------
 def normalize_key(s: str) -> str:
-    s2 = re.sub(r"\s+", " ", s.strip())
-    s2 = s2.replace("–", "-").replace("—", "-")
-    return s2
+    s2 = s.replace("–", "-").replace("—", "-")
+    return " ".join(s2.split())
+
+
+def _is_hoodie_lower(t: str) -> bool:
+    return any(marker in t for marker in HOODIE_MARKERS)
+
+
+def _is_sweatshirt_nonhoodie_lower(t: str) -> bool:
+    return ("sweatshirt" in t) and (not _is_hoodie_lower(t))
 
 
 def is_hoodie(txt: str) -> bool:
-    return any(marker in txt.lower() for marker in HOODIE_MARKERS)
+    return _is_hoodie_lower(txt.lower())
 
 
 def is_sweatshirt_nonhoodie(txt: str) -> bool:
-    t = txt.lower()
-    return ("sweatshirt" in t) and (not is_hoodie(txt))
+    return _is_sweatshirt_nonhoodie_lower(txt.lower())
 
 
-def parse_lines(lines: Sequence[str], max_blank: int = 2) -> List[Tuple[str, int]]:
+def iter_entries(lines: Iterable[str], radius: int = 5) -> Iterator[Tuple[str, int]]:
     """
-   For each label line, searches a few lines above/below for Qty/Quantity
+    Streaming version of parse_lines: consumes lines lazily (e.g. page by page)
+    and yields (label_value, qty) in label order.
+    Same lookup as find_quantity_near: the nearest Qty line within `radius`
+    ABOVE wins, else the first one within `radius` BELOW, else 1.
     """
-    entries: List[Tuple[str, int]] = []
-    lines_list = [ln.replace("\xa0", " ") for ln in lines]
-
-    for idx, ln in enumerate(lines_list):
-        m = LABEL_RE.match(ln)
-        if not m:
-            continue
+    last_qty_idx = -radius - 1
+    last_qty = 1
+    # [line index, label_value, qty]; qty stays None while waiting for a Qty
+    # line below. Entries are yielded from the front once resolved, which
+    # keeps label order.
+    pending: Deque[list] = deque()
+
+    for idx, ln in enumerate(lines):
+        qty = _line_quantity(ln)
+        for item in pending:
+            if item[2] is None:
+                if item[0] < idx - radius:
+                    item[2] = 1
+                elif qty is not None:
+                    item[2] = qty
+
+        if not ln.isascii() or ln.lstrip()[:7].lower().startswith(LABEL_PREFIXES):
+            m = LABEL_RE.match(ln)
+            if m:
+                above = last_qty if last_qty_idx >= idx - radius else None
+                pending.append([idx, m.group(1).strip(), above])
+
+        # Updated after the label check: a line never supplies its own quantity
+        if qty is not None:
+            last_qty_idx, last_qty = idx, qty
+
+        while pending and pending[0][2] is not None:
+            _, label_value, q = pending.popleft()
+            yield label_value, q
+
+    for _, label_value, q in pending:
+        yield label_value, 1 if q is None else q
 
-        label_value = m.group(1).strip()
-        qty = find_quantity_near(lines_list, idx, radius=5)
-        entries.append((label_value, qty))
 
-    return entries
+def parse_lines(lines: Sequence[str], max_blank: int = 2) -> List[Tuple[str, int]]:
+    """
+   For each label line, searches a few lines above/below for Qty/Quantity
+    Lines are used as given; extract_from_path already replaces non-breaking spaces with spaces.
+    """
+    return list(iter_entries(lines, radius=5))
 
 
 @dataclass
@@ -152,6 +280,10 @@ class ExtractionResult:
     unique_count: int
     sweatshirt_nonhoodie_total: int
     hoodie_total: int
+    # sum of agg values, counted while aggregating
+    total_items: int
+    # agg key -> key.lower(), shared by the category/sort helpers
+    lowered: Dict[str, str] = field(default_factory=dict, repr=False)
 
     @property
     def sweatshirt_total(self) -> int:
@@ -159,118 +291,299 @@ class ExtractionResult:
 
 
 def summarize(entries: Iterable[Tuple[str, int]]) -> ExtractionResult:
-    agg: Dict[str, int] = defaultdict(int)
+    agg: Dict[str, int] = {}
+    total = 0
     for raw, q in entries:
-        agg[normalize_key(raw)] += int(q)
-    hoodie_total = sum(q for k, q in agg.items() if is_hoodie(k))
-    sweat_total = sum(q for k, q in agg.items() if is_sweatshirt_nonhoodie(k))
+        k = normalize_key(raw)
+        q = int(q)
+        agg[k] = agg.get(k, 0) + q
+        total += q
+    lowered = {k: k.lower() for k in agg}
+    # One hoodie check per key, reused to exclude hoodies from sweatshirts
+    hoodie_total = 0
+    sweat_total = 0
+    for k, q in agg.items():
+        t = lowered[k]
+        if _is_hoodie_lower(t):
+            hoodie_total += q
+        elif "sweatshirt" in t:
+            sweat_total += q
     return ExtractionResult(
-        agg=dict(agg),
+        agg=agg,
         unique_count=len(agg),
         sweatshirt_nonhoodie_total=sweat_total,
         hoodie_total=hoodie_total,
+        total_items=total,
+        lowered=lowered,
     )
 
 
 # ------------------------- I/O helpers -------------------------
-def read_pdf_text(path: str) -> str:
-    if pdf_extract_text is None:
-        raise RuntimeError("pdfminer.six is not installed. Install it or provide a .txt file.")
-    return pdf_extract_text(path) or ""
+# A PDF source is a file path, the file's bytes or a binary file object
+# (e.g. an in-memory upload). File objects are read in place; only paths and
+# bytes are sent to worker processes, since open files do not pickle.
+PdfSource = Union[str, bytes, BinaryIO]
+
+# PDFium is not thread-safe and Streamlit runs each session in its own thread:
+# every pypdfium2 call (open, page read, close) is made under this lock.
+_PDFIUM_LOCK = threading.Lock()
+
+
+def _pdfminer_input(src: PdfSource):
+    if isinstance(src, bytes):
+        return io.BytesIO(src)
+    if not isinstance(src, str):
+        src.seek(0)
+    return src
+
+
+def _pdf_page_count(src: PdfSource) -> int:
+    """pdfminer page count; only needed to split work for the process pool."""
+    if PDFPage is None:
+        return 0
+    if not isinstance(src, str):
+        return sum(1 for _ in PDFPage.get_pages(_pdfminer_input(src)))
+    with open(src, "rb") as f:
+        return sum(1 for _ in PDFPage.get_pages(f))
+
+
+def _iter_pdf_pages(src: PdfSource) -> Iterator[str]:
+    """pypdfium2 text of every page, one page at a time."""
+    # The lock is released between pages, so it is never held while the
+    # caller consumes a page.
+    with _PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(src)
+        page_count = len(pdf)
+    try:
+        for i in range(page_count):
+            with _PDFIUM_LOCK:
+                page = pdf[i]
+                textpage = page.get_textpage()
+                text = textpage.get_text_range()
+                textpage.close()
+                page.close()
+            yield text + "\n"
+    finally:
+        with _PDFIUM_LOCK:
+            pdf.close()
+
+
+def _read_pdf_pages(src: PdfSource, start: int, stop: int) -> str:
+    """pdfminer text of pages [start, stop). Runs in worker processes, so it reopens the document."""
+    return pdf_extract_text(_pdfminer_input(src), page_numbers=range(start, stop), laparams=PDFMINER_LAPARAMS) or ""
+
+
+def iter_pdf_text(src: PdfSource) -> Iterator[str]:
+    """
+    Yield the text of a PDF path, bytes or binary file object in page order.
+    Uses pypdfium2 when available (no layout analysis, much faster), one page
+    per chunk; falls back to pdfminer.six otherwise.
+    With pdfminer, long documents are split into page ranges and extracted in
+    parallel; each range is yielded as soon as it and all earlier ranges are done.
+    """
+    if pdfium is None and pdf_extract_text is None:
+        raise RuntimeError("pypdfium2 or pdfminer.six is required. Install one or provide a .txt file.")
+
+    if pdfium is not None:
+        yield from _iter_pdf_pages(src)
+        return
+
+    # Only count pages (a walk of the whole page tree) when a pool is possible
+    cpus = os.cpu_count() or 1
+    page_count = _pdf_page_count(src) if cpus > 1 else 0
+    workers = min(cpus, page_count)
+    if page_count < PARALLEL_MIN_PAGES or workers < 2:
+        yield pdf_extract_text(_pdfminer_input(src), laparams=PDFMINER_LAPARAMS) or ""
+        return
+
+    if not isinstance(src, (str, bytes)):
+        src.seek(0)
+        src = src.read()
+
+    # Contiguous ranges, one per worker; map() yields them in page order.
+    bounds = [page_count * w // workers for w in range(workers + 1)]
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        yield from pool.map(_read_pdf_pages, [src] * workers, bounds[:-1], bounds[1:])
+
+
+def read_pdf_text(src: PdfSource) -> str:
+    """Extract raw text from a PDF path, bytes or binary file object (see iter_pdf_text)."""
+    return "".join(iter_pdf_text(src))
+
+
+def _iter_lines(chunks: Iterable[str]) -> Iterator[str]:
+    # Chunks end on a line break (page text), so splitting them one by one
+    # gives the same lines as splitting the joined text.
+    for chunk in chunks:
+        yield from chunk.replace("\xa0", " ").splitlines()
+
+
+def _extract_from_chunks(chunks: Iterable[str]) -> ExtractionResult:
+    return summarize(iter_entries(_iter_lines(chunks), radius=5))
 
 
 def extract_from_path(path: str, max_blank: int = 2) -> ExtractionResult:
     ext = os.path.splitext(path)[1].lower()
     if ext == ".pdf":
-        text = read_pdf_text(path)
-    else:
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            text = f.read()
-    lines = [ln.rstrip("\n") for ln in text.splitlines()]
-    entries = parse_lines(lines, max_blank=max_blank)
-    return summarize(entries)
+        return _extract_from_chunks(iter_pdf_text(path))
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        text = f.read()
+    return _extract_from_chunks([text])
+
+
+def extract_from_stream(stream: BinaryIO, filename: str) -> ExtractionResult:
+    """Like extract_from_path, for an in-memory file; `filename` only selects PDF vs text."""
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == ".pdf":
+        return _extract_from_chunks(iter_pdf_text(stream))
+    text = stream.read().decode("utf-8", errors="ignore")
+    return _extract_from_chunks([text])
 
 
 # ------------------------- Category logic -------------------------
+def _category_flags(n: str) -> int:
+    flags = 0
+    for marker, bit in CATEGORY_MARKERS:
+        if marker in n:
+            flags |= bit
+    return flags
+
+
+@lru_cache(maxsize=4096)
 def category_rank(name: str) -> int:
-    n = name.lower()
+    return category_rank_lower(name.lower())
+
 
-    short_sleeve_pat = r"(shortsleeve|short\s*-?\s*sleeve|t\s*-?\s*shirt|tshirt|\btee\b)"
-    toddler_pat = r"\b[2-5]t\b"
-    size_pat = r"\b(xs|s|m|l|xl|[2-6]xl)\b"
+@lru_cache(maxsize=4096)
+def category_rank_lower(n: str) -> int:
+    """category_rank for an already lowercased name."""
+    f = _category_flags(n)
 
     # 0 = Sweatshirts (non-hoodie)
-    if "sweatshirt" in n and "hooded" not in n and "hoodie" not in n:
+    if f & _SWEAT and not f & (_HOODED | _HOODIE):
         return 0
 
     # 1 = Long sleeve
-    if "long sleeve" in n or "long-sleeve" in n or "longsleeve" in n:
+    if f & _LONG_SLEEVE:
         return 1
 
     # 2 = Hoodies
-    if ("hooded sweatshirt" in n) or ("unisex hoodie" in n) or re.search(r"\bhoodie\b", n):
+    if f & (_HOODED_SWEAT | _UNISEX_HOODIE) or (f & _HOODIE and HOODIE_WORD_RE.search(n)):
         return 2
 
     # 10 = V-necks (Unisex V-neck dahil)
-    if ("v-neck" in n) or ("v neck" in n) or ("vneck" in n):
+    if f & _VNECK:
         return 10
 
+    short_sleeve = bool(f & _SHORT_SLEEVE) or bool(f & _SHORT_SLEEVE_MAYBE and SHORT_SLEEVE_RE.search(n))
+    toddler_size = TODDLER_RE.search(n) is not None
+
     # 3 = Adult/Unisex short-sleeve / tee (default if not youth/toddler)
-    if (
-        re.search(short_sleeve_pat, n)
-        and not ("youth" in n or re.search(toddler_pat, n) or "toddler" in n)
-    ):
+    if short_sleeve and not (f & (_YOUTH | _TODDLER) or toddler_size):
         return 3
 
     # 3b = Standalone Unisex with size treated as tee (e.g., "Unisex XL")
     if (
-        "unisex" in n
-        and not any(k in n for k in ["hoodie", "hooded", "sweatshirt"])
-        and not any(v in n for v in ["v-neck", "v neck", "vneck"])
-        and not ("youth" in n or "toddler" in n or re.search(toddler_pat, n))
-        and re.search(size_pat, n)
+        f & _UNISEX
+        and not f & (_HOODIE | _HOODED | _SWEAT | _VNECK | _YOUTH | _TODDLER)
+        and not toddler_size
+        and SIZE_RE.search(n)
     ):
         return 3
 
     # 4 = Youth short sleeve / tee
-    if re.search(short_sleeve_pat, n) and "youth" in n:
-        return 4
-
     # 5 = Other youth
-    if "youth" in n:
-        return 5
+    if f & _YOUTH:
+        return 4 if short_sleeve else 5
 
     # 6 = Toddler short-sleeve (2T–5T)
-    if re.search(toddler_pat, n) and re.search(r"(short|tee|shirt)", n):
+    if toddler_size and f & _TODDLER_TOP:
         return 6
 
     # 7 = Other toddler
-    if re.search(toddler_pat, n) or "toddler" in n:
+    if toddler_size or f & _TODDLER:
         return 7
 
     # 8 = Onesie / baby bodysuit
-    if ("onesie" in n) or ("baby bodysuit" in n) or ("bodysuit" in n):
+    if f & _ONESIE:
         return 8
 
     # 11 = everything else
     return 11
 
 
-def to_dataframe(agg: Dict[str, int]) -> "pd.DataFrame":
-    """Build a DataFrame sorted by custom category order, then by size within each category."""
+def size_rank(name: str) -> int:
+    return size_rank_lower(name.lower())
+
+
+@lru_cache(maxsize=4096)
+def size_rank_lower(n: str) -> int:
+    """Position of the first letter size (xs..6xl) in SIZE_ORDER; unsized names sort last."""
+    m = SIZE_RE.search(n)
+    if not m:
+        return len(SIZE_ORDER)
+    return SIZE_ORDER.get(m.group(1), len(SIZE_ORDER))
+
 
-    size_order = {s: i for i, s in enumerate(["xs", "s", "m", "l", "xl", "2xl", "3xl", "4xl", "5xl", "6xl"])}
+def category_ranks(agg: Dict[str, int], lowered: Optional[Dict[str, str]] = None) -> Dict[str, int]:
+    """category_rank for every key, so callers can share one classification pass."""
+    if lowered is None:
+        return {name: category_rank(name) for name in agg}
+    return {name: category_rank_lower(lowered[name]) for name in agg}
 
-    def size_rank(name: str) -> int:
-        n = name.lower()
-        m = re.search(r"\b(xs|s|m|l|xl|[2-6]xl)\b", n)
-        if not m:
-            return len(size_order)
-        return size_order.get(m.group(1), len(size_order))
 
-    def sort_key(item):
-        name = item[0]
-        return (category_rank(name), size_rank(name), name.lower())
+def category_rank_many(names: Sequence[str]) -> "np.ndarray":
+    """category_rank for each name, as an intp array (for bincount/table lookups)."""
+    rank = category_rank
+    return np.fromiter((rank(name) for name in names), dtype=np.intp, count=len(names))
 
-    data = sorted(agg.items(), key=sort_key)
-    return pd.DataFrame(data, columns=["Style / Size", "Total Quantity Ordered"])
+
+def summarize_by_category(df: "pd.DataFrame", ranks: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """
+    Total quantities per SUMMARY_BUCKETS entry, computed on a to_dataframe() frame.
+    Apron/tote are counted by name, on top of their category.
+    """
+    names = df["Style / Size"]
+    qty = df["Total Quantity Ordered"]
+    if ranks is None:
+        cats = category_rank_many(names)
+    else:
+        cats = np.fromiter((ranks[name] for name in names), dtype=np.intp, count=len(names))
+    bucket_ids = CATEGORY_BUCKET_INDEX[cats]
+    in_bucket = bucket_ids >= 0
+    by_bucket = np.bincount(
+        bucket_ids[in_bucket],
+        weights=qty.to_numpy(dtype=np.float64)[in_bucket],
+        minlength=len(SUMMARY_BUCKETS),
+    )
+    totals = {bucket: int(total) for bucket, total in zip(SUMMARY_BUCKETS, by_bucket)}
+
+    # Case-insensitive literal scans; no intermediate lowercased column
+    totals["apron"] = int(qty[names.str.contains("apron", case=False, regex=False)].sum())
+    totals["tote"] = int(qty[names.str.contains("tote", case=False, regex=False)].sum())
+    return totals
+
+
+def to_dataframe(
+    agg: Dict[str, int],
+    ranks: Optional[Dict[str, int]] = None,
+    lowered: Optional[Dict[str, str]] = None,
+) -> "pd.DataFrame":
+    """Build a DataFrame sorted by custom category order, then by size within each category."""
+    if lowered is None:
+        lowered = {name: name.lower() for name in agg}
+    if ranks is None:
+        ranks = category_ranks(agg, lowered)
+
+    def sort_key(name):
+        n = lowered[name]
+        return (ranks[name], size_rank_lower(n), n)
+
+    # Sort the keys only and build the frame column-wise, instead of from a
+    # list of (style, qty) row tuples.
+    names = sorted(agg, key=sort_key)
+    return pd.DataFrame({
+        "Style / Size": np.array(names, dtype=object),
+        "Total Quantity Ordered": np.fromiter((agg[name] for name in names), dtype=np.int64, count=len(names)),
+    })
@@ -1,9 +1,56 @@
-import tempfile
-import os
+import hashlib
+import io
 
 import streamlit as st
 
-from size_style_core import extract_from_path, to_dataframe, category_rank
+from size_style_core import extract_from_stream, to_dataframe, category_ranks, summarize_by_category
+
+
+# Streamlit reruns the script on every widget interaction; the upload is keyed
+# by file type + content digest so reruns (and re-uploads of the same file
+# under another name) skip the parse.
+# Leading-underscore arguments are not hashed by st.cache_data.
+# The caches are shared by all sessions, so each keeps only the most recent uploads.
+@st.cache_data(show_spinner=False, max_entries=32)
+def _extract_cached(suffix: str, digest: str, _stream):
+    # UploadedFile is a BytesIO and is reused across reruns: rewind first
+    _stream.seek(0)
+    return extract_from_stream(_stream, "upload" + suffix)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _tables_cached(suffix: str, digest: str, _result):
+    ranks = category_ranks(_result.agg, _result.lowered)
+    df = to_dataframe(_result.agg, ranks, _result.lowered)
+    return df, summarize_by_category(df, ranks)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _csv_cached(suffix: str, digest: str, _df):
+    # Straight to UTF-8 bytes, without building the CSV as a str first
+    buf = io.BytesIO()
+    _df.to_csv(buf, index=False, encoding="utf-8")
+    return buf.getvalue()
+
+
+# Table + download run as a fragment: clicking the download button reruns
+# only this function, not the upload/summary part of main().
+@st.fragment
+def _render_exports(df, suffix: str, digest: str):
+    # --- TABLE ---
+    st.subheader("Detaylı tablo (Style / Size)")
+
+    st.dataframe(df)
+
+    # --- Download buttons ---
+    st.subheader("Dışa aktarım")
+
+    csv_data = _csv_cached(suffix, digest, df)
+    st.download_button(
+        label="CSV indir",
+        data=csv_data,
+        file_name="style_size_summary.csv",
+        mime="text/csv",)
 
 
 def main():
@@ -14,59 +61,18 @@ def main():
     uploaded_file = st.file_uploader("PDF yükle",type=["pdf", "txt"], )
     if uploaded_file is not None:
         suffix = "." + uploaded_file.name.split(".")[-1].lower()
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            tmp.write(uploaded_file.read())
-            tmp_path = tmp.name
-
-        try:
-            result = extract_from_path(tmp_path)
-
-        finally:
-           
-            try:
-                os.remove(tmp_path)
-            except OSError:
-                pass
-
-        df = to_dataframe(result.agg)
+        with uploaded_file.getbuffer() as data:
+            digest = hashlib.blake2b(data, digest_size=8).hexdigest()
+        result = _extract_cached(suffix, digest, uploaded_file)
+        df, totals = _tables_cached(suffix, digest, result)
 
         # --- SUMMARY ---
         st.subheader("Özet")
 
-        total_items = int(sum(result.agg.values()))
+        total_items = result.total_items
 
         sweatshirt_total = result.sweatshirt_nonhoodie_total
         hoodie_total = result.hoodie_total
-        vneck_total = 0
-        longsleeve_total = 0
-        adult_tee_total = 0
-        youth_total = 0
-        toddler_total = 0
-        onesie_total = 0
-        apron_total = 0
-        tote_total = 0
-
-        for style, q in result.agg.items():
-            cat = category_rank(style)
-            s_lower = style.lower()
-
-            if cat == 1:
-                longsleeve_total += q
-            elif cat == 3:
-                adult_tee_total += q
-            elif cat in (4, 5):
-                youth_total += q
-            elif cat in (6, 7):
-                toddler_total += q
-            elif cat == 8:
-                onesie_total += q
-            elif cat == 10:
-                vneck_total += q
-
-            if "apron" in s_lower:
-                apron_total += q
-            if "tote" in s_lower:
-                tote_total += q
 
         st.markdown(
             f"""
@@ -76,31 +82,18 @@ def main():
 **By Category**  
 - Sweatshirts (non-hoodie): **{sweatshirt_total}**  
 - Hoodies: **{hoodie_total}**  
-- Adult Short Sleeve / Tees: **{adult_tee_total}**  
-- V-Neck: **{vneck_total}**  
-- Long Sleeve: **{longsleeve_total}**  
-- Youth (all): **{youth_total}**  
-- Toddler (all): **{toddler_total}**  
-- Onesie / Baby Bodysuit: **{onesie_total}**  
-- Apron: **{apron_total}**  
-- Tote Bag: **{tote_total}**  
+- Adult Short Sleeve / Tees: **{totals['adult_tee']}**  
+- V-Neck: **{totals['vneck']}**  
+- Long Sleeve: **{totals['longsleeve']}**  
+- Youth (all): **{totals['youth']}**  
+- Toddler (all): **{totals['toddler']}**  
+- Onesie / Baby Bodysuit: **{totals['onesie']}**  
+- Apron: **{totals['apron']}**  
+- Tote Bag: **{totals['tote']}**  
 """
         )
 
-        # --- TABLE ---
-        st.subheader("Detaylı tablo (Style / Size)")
-
-        st.dataframe(df)
-
-        # --- Download buttons ---
-        st.subheader("Dışa aktarım")
-
-        csv_data = df.to_csv(index=False).encode("utf-8")
-        st.download_button(
-            label="CSV indir",
-            data=csv_data,
-            file_name="style_size_summary.csv",
-            mime="text/csv",)
+        _render_exports(df, suffix, digest)
 
 
 if __name__ == "__main__":